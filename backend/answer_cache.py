@@ -0,0 +1,97 @@
+import os
+import time
+import itertools
+import threading
+from collections import OrderedDict
+import numpy as np
+import metrics
+
+
+class CachedAnswer:
+    def __init__(self, project_id, project_context, vector, source_ids, question, answer):
+        self.project_id = project_id
+        self.project_context = project_context
+        self.vector = vector
+        self.source_ids = source_ids
+        self.question = question
+        self.answer = answer
+        self.created_at = time.monotonic()
+
+
+class SemanticAnswerCache:
+    """
+    In-process cache of RAG answers keyed by question embedding.
+
+    A cached answer is reused when a new question for the same project is
+    within `threshold` cosine similarity and retrieval returned the same
+    source papers in the same order. Entries expire after `ttl_seconds`
+    and the least recently used entry is evicted past `max_entries`.
+
+    Each worker process keeps its own cache, so hit rates are per worker and
+    invalidate_project only clears the local copy. Entries are therefore also
+    matched on the project context the answer was generated with, so another
+    worker never serves an answer for a project that has since been changed
+    or deleted.
+    """
+
+    def __init__(self, threshold: float = 0.95, ttl_seconds: float = 3600, max_entries: int = 1000):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._keys = itertools.count()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, project_id, project_context, question_vector, source_ids):
+        """Return the best matching CachedAnswer, or None"""
+        vector = self._normalize(question_vector)
+        source_ids = tuple(source_ids)
+        now = time.monotonic()
+        best, best_score = None, self.threshold
+
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if now - entry.created_at > self.ttl_seconds:
+                    del self._entries[key]
+                    continue
+                if (entry.project_id != project_id or entry.project_context != project_context
+                        or entry.source_ids != source_ids):
+                    continue
+                score = float(np.dot(entry.vector, vector))
+                if score >= best_score:
+                    best, best_score = key, score
+
+            if best is None:
+                metrics.inc("dora_rag_cache_total", result="miss")
+                return None
+            self._entries.move_to_end(best)
+            metrics.inc("dora_rag_cache_total", result="hit")
+            return self._entries[best]
+
+    def store(self, project_id, project_context, question_vector, source_ids, question, answer):
+        entry = CachedAnswer(
+            project_id, project_context, self._normalize(question_vector), tuple(source_ids), question, answer
+        )
+        with self._lock:
+            self._entries[next(self._keys)] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_project(self, project_id):
+        """Drop cached answers for a project whose context changed or was deleted"""
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if e.project_id == project_id]:
+                del self._entries[key]
+
+
+answer_cache = SemanticAnswerCache(
+    threshold=float(os.getenv("RAG_CACHE_THRESHOLD", "0.95")),
+    ttl_seconds=float(os.getenv("RAG_CACHE_TTL", "3600")),
+    max_entries=int(os.getenv("RAG_CACHE_MAX_ENTRIES", "1000"))
+)
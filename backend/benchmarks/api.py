@@ -0,0 +1,190 @@
+"""
+Concurrent load benchmark for every endpoint in main.py.
+
+Runs in-process against an in-memory Qdrant seeded with synthetic papers,
+a fake LLM provider and a temp SQLite database, then reports p50/p95/p99
+latency and throughput per endpoint.
+
+Usage (from backend/):
+    uv run python -m benchmarks.api --papers 2000 --requests 200 --concurrency 16
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+from benchmarks import fakes
+from benchmarks.common import summarize_latencies, save_results, print_table
+
+
+async def run_scenario(client, make_request, total: int, concurrency: int) -> dict:
+    """Issue `total` requests with at most `concurrency` in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one(i):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await make_request(client, i)
+                failed = response.status_code >= 400
+            except Exception:
+                failed = True
+            latencies.append(time.perf_counter() - start)
+            if failed:
+                errors += 1
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return summarize_latencies(latencies, time.perf_counter() - wall_start, errors)
+
+
+def random_query(rng: random.Random) -> str:
+    return " ".join(rng.choices(fakes.WORDS, k=rng.randint(2, 6)))
+
+
+async def main_async(args):
+    import httpx
+    import qdrant
+    if not args.real_embeddings:
+        qdrant.embedding_model = fakes.FakeEmbeddingModel()
+
+    import main
+    from database import init_db
+    from llm import llm_gateway
+    from qdrant import ensure_collection, populate_qdrant
+
+    llm_gateway.provider = fakes.FakeLLMProvider(delay=args.llm_delay)
+
+    # Seed the stand-ins (startup_event is not run, so nothing is fetched from ArXiv)
+    init_db()
+    ensure_collection()
+    papers = fakes.synthetic_papers(args.papers, seed=args.seed)
+    populate_qdrant(papers)
+
+    rng = random.Random(args.seed)
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        project_ids = []
+        seeded_ids = set()
+        for i in range(args.projects):
+            response = await client.post("/projects", json={
+                "name": f"Bench project {i}",
+                "context": random_query(rng) * 5,
+                "research_questions": [random_query(rng) for _ in range(3)],
+                "keywords": rng.sample(fakes.WORDS, 5)
+            })
+            response.raise_for_status()
+            project_id = response.json()["id"]
+            project_ids.append(project_id)
+            for paper in rng.sample(papers, min(args.saved_per_project, len(papers))):
+                seeded_ids.add(paper["id"])
+                response = await client.post(f"/projects/{project_id}/papers", json={"paper_id": paper["id"]})
+                response.raise_for_status()
+
+        created_projects = []
+        added_papers = []
+        unsaved = [p["id"] for p in papers if p["id"] not in seeded_ids]
+        rng.shuffle(unsaved)
+
+        async def create_project(c, i):
+            response = await c.post("/projects", json={
+                "name": f"Load project {i}", "context": random_query(rng),
+                "research_questions": [random_query(rng)], "keywords": [rng.choice(fakes.WORDS)]
+            })
+            if response.status_code == 200:
+                created_projects.append(response.json()["id"])
+            return response
+
+        async def add_paper(c, i):
+            project_id = project_ids[i % len(project_ids)]
+            paper_id = unsaved[i % len(unsaved)]
+            response = await c.post(f"/projects/{project_id}/papers", json={"paper_id": paper_id})
+            if response.status_code == 200:
+                added_papers.append((project_id, paper_id))
+            return response
+
+        async def remove_paper(c, i):
+            if not added_papers:
+                raise RuntimeError("No added papers left to remove")
+            project_id, paper_id = added_papers.pop()
+            return await c.delete(f"/projects/{project_id}/papers/{paper_id}")
+
+        async def delete_project(c, i):
+            if not created_projects:
+                raise RuntimeError("No created projects left to delete")
+            return await c.delete(f"/projects/{created_projects.pop()}")
+
+        scenarios = [
+            ("GET /", lambda c, i: c.get("/")),
+            ("GET /health", lambda c, i: c.get("/health")),
+            ("GET /metrics", lambda c, i: c.get("/metrics")),
+            ("POST /projects", create_project),
+            ("GET /projects", lambda c, i: c.get("/projects")),
+            ("GET /projects/{id}", lambda c, i: c.get(f"/projects/{rng.choice(project_ids)}")),
+            ("GET /projects/{id}/papers", lambda c, i: c.get(f"/projects/{rng.choice(project_ids)}/papers")),
+            ("POST /projects/{id}/papers", add_paper),
+            ("DELETE /projects/{id}/papers/{paper_id}", remove_paper),
+            ("POST /papers/search", lambda c, i: c.post("/papers/search", json={
+                "query": random_query(rng), "top_k": args.top_k, "project_id": rng.choice(project_ids)
+            })),
+            ("POST /papers/search (lean)", lambda c, i: c.post("/papers/search", json={
+                "query": random_query(rng), "top_k": args.top_k,
+                "project_id": rng.choice(project_ids), "lean": True
+            })),
+            ("POST /papers/search (filtered)", lambda c, i: c.post("/papers/search", json={
+                "query": random_query(rng), "top_k": args.top_k,
+                "categories": rng.sample(fakes.CATEGORIES, 2), "published_after": "2025-01-01T12:00:00"
+            })),
+            ("POST /papers/search_batch", lambda c, i: c.post("/papers/search_batch", json={
+                "queries": [random_query(rng) for _ in range(5)], "top_k": args.top_k,
+                "project_id": rng.choice(project_ids), "merge": True
+            })),
+            ("POST /papers/search_and_rank", lambda c, i: c.post("/papers/search_and_rank", json={
+                "query": random_query(rng), "top_k": args.top_k,
+                "project_id": rng.choice(project_ids), "rerank_top_n": 5
+            })),
+            ("POST /papers/ask", lambda c, i: c.post("/papers/ask", json={
+                "question": random_query(rng), "project_id": rng.choice(project_ids), "num_papers": 5
+            })),
+            ("POST /projects/{id}/summarize_saved", lambda c, i: c.post(
+                f"/projects/{rng.choice(project_ids)}/summarize_saved"
+            )),
+            ("DELETE /projects/{id}", delete_project),
+        ]
+
+        results = {}
+        for name, make_request in scenarios:
+            if args.only and args.only not in name:
+                continue
+            print(f"Running {name} ({args.requests} requests, concurrency {args.concurrency})...")
+            results[name] = await run_scenario(client, make_request, args.requests, args.concurrency)
+
+    print_table(results)
+    failed = [name for name, r in results.items() if r["errors"]]
+    save_results("api", vars(args), results, valid=not failed)
+    if failed:
+        print(f"\nINVALID RUN: {len(failed)} scenario(s) had errors: {', '.join(failed)}")
+        sys.exit(1)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load benchmark for the ArXiv Research Assistant API")
+    parser.add_argument("--papers", type=int, default=2000, help="Synthetic papers to seed Qdrant with")
+    parser.add_argument("--projects", type=int, default=10, help="Projects to create before the run")
+    parser.add_argument("--saved-per-project", type=int, default=20, help="Papers saved to each project")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent requests in flight")
+    parser.add_argument("--top-k", type=int, default=10, help="top_k used by search endpoints")
+    parser.add_argument("--llm-delay", type=float, default=0.05, help="Fake LLM response delay in seconds")
+    parser.add_argument("--real-embeddings", action="store_true", help="Use all-mpnet-base-v2 instead of fake embeddings")
+    parser.add_argument("--only", help="Only run endpoints whose name contains this string")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main_async(parse_args()))
@@ -0,0 +1,84 @@
+import glob
+import json
+import os
+import platform
+import statistics
+from datetime import datetime
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def percentile(sorted_values, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize_latencies(latencies, wall_seconds: float, errors: int = 0) -> dict:
+    """Summarize latencies (seconds) into p50/p95/p99 in ms and throughput"""
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "errors": errors,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(values) * 1000, 3) if values else 0.0,
+        "throughput_per_s": round(len(values) / wall_seconds, 2) if wall_seconds > 0 else 0.0
+    }
+
+
+def save_results(name: str, config: dict, results: dict, valid: bool = True) -> str:
+    """
+    Write results to benchmarks/results/<name>-<timestamp>.json and compare with
+    the previous valid run. Runs with errors are saved with valid=false.
+    """
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    previous = [p for p in sorted(glob.glob(os.path.join(RESULTS_DIR, f"{name}-*.json"))) if _is_valid(p)]
+
+    path = os.path.join(RESULTS_DIR, f"{name}-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump({
+            "benchmark": name,
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "config": config,
+            "valid": valid,
+            "results": results
+        }, f, indent=2)
+    print(f"\nSaved results to {path}")
+
+    if previous and valid:
+        compare_results(previous[-1], path)
+    return path
+
+
+def _is_valid(path: str) -> bool:
+    with open(path) as f:
+        return json.load(f).get("valid", True)
+
+
+def compare_results(old_path: str, new_path: str):
+    """Print p95 changes between two result files"""
+    with open(old_path) as f:
+        old = json.load(f)["results"]
+    with open(new_path) as f:
+        new = json.load(f)["results"]
+
+    print(f"Compared with {os.path.basename(old_path)} (p95):")
+    for key, stats in new.items():
+        if key not in old or "p95_ms" not in stats:
+            continue
+        before, after = old[key]["p95_ms"], stats["p95_ms"]
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"  {key:45s} {before:10.2f}ms -> {after:10.2f}ms ({change:+.1f}%)")
+
+
+def print_table(results: dict):
+    print(f"\n{'benchmark':45s} {'n':>7s} {'err':>5s} {'p50':>10s} {'p95':>10s} {'p99':>10s} {'ops/s':>10s}")
+    for key, r in results.items():
+        print(f"{key:45s} {r['count']:7d} {r['errors']:5d} {r['p50_ms']:10.2f} "
+              f"{r['p95_ms']:10.2f} {r['p99_ms']:10.2f} {r['throughput_per_s']:10.2f}")
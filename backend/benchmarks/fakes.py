@@ -0,0 +1,85 @@
+"""
+Local stand-ins for the benchmark suite: synthetic papers, a deterministic
+embedding model and a fake LLM provider with configurable delay.
+
+Importing this module points Qdrant at an embedded in-memory instance and
+SQLite at a temp database, so it must be imported before main/qdrant/database.
+"""
+import os
+import random
+import tempfile
+import time
+import hashlib
+from datetime import datetime, timedelta
+import numpy as np
+
+_tmp_dir = tempfile.mkdtemp(prefix="dora-bench-")
+os.environ.setdefault("QDRANT_URL", ":memory:")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}")
+os.environ.setdefault("GEMINI_API_KEY", "bench-fake-key")
+# Don't let the production rate limit dominate fake LLM latency
+os.environ.setdefault("LLM_REQUESTS_PER_MINUTE", "600000")
+os.environ.setdefault("LLM_BURST", "1000")
+
+EMBEDDING_DIM = 768
+
+WORDS = (
+    "neural network transformer attention diffusion graph reinforcement learning "
+    "privacy federated quantum optimization bayesian inference causal robust "
+    "language model vision segmentation retrieval benchmark dataset convergence "
+    "stochastic gradient kernel sparse manifold embedding contrastive adversarial "
+    "healthcare robotics planning control theorem estimator regression cluster"
+).split()
+
+CATEGORIES = ["cs.AI", "cs.LG", "cs.CV", "cs.CL", "stat.ML", "quant-ph", "math.OC", "cs.DB"]
+
+
+def synthetic_papers(n: int, seed: int = 0):
+    """Generate n synthetic papers shaped like fetch_arxiv_papers_by_category output"""
+    rng = random.Random(seed)
+    papers = []
+    for i in range(n):
+        papers.append({
+            "id": f"{2400 + i // 100000}.{i % 100000:05d}v1",
+            "title": " ".join(rng.choices(WORDS, k=8)).title(),
+            "abstract": " ".join(rng.choices(WORDS, k=180)),
+            "url": f"http://arxiv.org/abs/bench.{i}",
+            "authors": [f"Author {rng.randint(1, 5000)}" for _ in range(rng.randint(1, 8))],
+            "category": rng.choice(CATEGORIES),
+            "published": (datetime(2025, 1, 1) + timedelta(minutes=i)).isoformat()
+        })
+    return papers
+
+
+class FakeEmbeddingModel:
+    """Deterministic stand-in for SentenceTransformer.encode (no model weights needed)"""
+
+    def _encode_one(self, text: str):
+        seed = int.from_bytes(hashlib.md5(text.encode()).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(EMBEDDING_DIM).astype(np.float32)
+        return vector / np.linalg.norm(vector)
+
+    def encode(self, sentences, **kwargs):
+        if isinstance(sentences, str):
+            return self._encode_one(sentences)
+        return np.stack([self._encode_one(s) for s in sentences])
+
+
+class FakeLLMProvider:
+    """LLM provider for llm.LLMGateway that returns canned responses after a delay"""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+
+    def generate(self, prompt: str, timeout: float):
+        from llm import LLMResult
+
+        time.sleep(self.delay)
+        if "SCORE|EXPLANATION" in prompt:
+            text = f"{random.randint(0, 100)}|Canned relevance explanation for benchmarking."
+        else:
+            text = "Canned answer for benchmarking. " * 40
+        return LLMResult(text=text, prompt_tokens=len(prompt.split()), completion_tokens=len(text.split()))
+
+    def is_retryable(self, error: Exception) -> bool:
+        return False
@@ -0,0 +1,123 @@
+"""
+Micro-benchmarks for get_embedding, populate_qdrant and list_projects at
+several scales, against an in-memory Qdrant and a temp SQLite database.
+
+Usage (from backend/):
+    uv run python -m benchmarks.micro --scales 10,1000,100000
+    uv run python -m benchmarks.micro --fake-embeddings   # isolate Qdrant/SQLite cost
+"""
+import argparse
+import time
+import uuid
+
+from benchmarks import fakes
+from benchmarks.common import summarize_latencies, save_results
+
+
+# Abstracts encoded per get_embedding repeat; per-call cost doesn't depend on corpus size
+EMBEDDING_SAMPLE = 100
+
+
+def bench_get_embedding(papers, repeats: int) -> dict:
+    from qdrant import get_embedding
+
+    sample = [paper["abstract"] for paper in papers[:EMBEDDING_SAMPLE]]
+    latencies = []
+    wall_start = time.perf_counter()
+    for _ in range(repeats):
+        for abstract in sample:
+            start = time.perf_counter()
+            get_embedding(abstract)
+            latencies.append(time.perf_counter() - start)
+    return summarize_latencies(latencies, time.perf_counter() - wall_start)
+
+
+def bench_populate_qdrant(papers, repeats: int) -> dict:
+    from qdrant import qdrant, ensure_collection, populate_qdrant
+
+    latencies = []
+    wall_start = time.perf_counter()
+    for _ in range(repeats):
+        if qdrant.collection_exists("all_papers"):
+            qdrant.delete_collection("all_papers")
+        ensure_collection()
+        start = time.perf_counter()
+        populate_qdrant(papers)
+        latencies.append(time.perf_counter() - start)
+    result = summarize_latencies(latencies, time.perf_counter() - wall_start)
+    result["items_per_s"] = round(len(papers) * len(latencies) / sum(latencies), 2)
+    return result
+
+
+def bench_list_projects(papers, repeats: int) -> dict:
+    import main
+    from database import SessionLocal, ProjectDB, ProjectPaperDB, PaperDB
+
+    db = SessionLocal()
+    try:
+        db.query(ProjectPaperDB).delete()
+        db.query(ProjectDB).delete()
+        db.query(PaperDB).delete()
+        for i, paper in enumerate(papers):
+            db.add(PaperDB.from_payload(paper))
+            project_id = str(uuid.uuid4())
+            db.add(ProjectDB(
+                id=project_id, name=f"Project {i}", context=paper["abstract"][:200],
+                research_questions=[paper["title"]], keywords=paper["title"].split()[:3]
+            ))
+            db.add(ProjectPaperDB(id=str(uuid.uuid4()), project_id=project_id, paper_id=paper["id"]))
+        db.commit()
+
+        latencies = []
+        wall_start = time.perf_counter()
+        for _ in range(repeats):
+            start = time.perf_counter()
+            main.list_projects(db)
+            latencies.append(time.perf_counter() - start)
+        return summarize_latencies(latencies, time.perf_counter() - wall_start)
+    finally:
+        db.close()
+
+
+BENCHMARKS = {
+    "get_embedding": bench_get_embedding,
+    "populate_qdrant": bench_populate_qdrant,
+    "list_projects": bench_list_projects,
+}
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for embedding, ingestion and project listing")
+    parser.add_argument("--scales", default="10,1000,100000", help="Comma-separated item counts")
+    parser.add_argument("--repeats", type=int, default=5, help="Repetitions per benchmark (get_embedding repeats a fixed sample)")
+    parser.add_argument("--only", choices=sorted(BENCHMARKS), help="Run a single benchmark")
+    parser.add_argument("--fake-embeddings", action="store_true", help="Use a deterministic fake embedding model")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import qdrant
+    from database import init_db
+    if args.fake_embeddings:
+        qdrant.embedding_model = fakes.FakeEmbeddingModel()
+    init_db()
+
+    results = {}
+    for scale in [int(s) for s in args.scales.split(",")]:
+        papers = fakes.synthetic_papers(scale, seed=args.seed)
+        for name, bench in BENCHMARKS.items():
+            if args.only and name != args.only:
+                continue
+            # populate_qdrant and list_projects are whole-corpus operations; repeat fewer times at scale
+            repeats = args.repeats if scale < 100000 else 1
+            print(f"Running {name} at scale {scale}...")
+            results[f"{name}[{scale}]"] = bench(papers, repeats)
+
+    print(f"\n{'benchmark':30s} {'n':>7s} {'p50 ms':>12s} {'p95 ms':>12s} {'p99 ms':>12s} {'ops/s':>10s}")
+    for key, r in results.items():
+        print(f"{key:30s} {r['count']:7d} {r['p50_ms']:12.2f} {r['p95_ms']:12.2f} "
+              f"{r['p99_ms']:12.2f} {r['throughput_per_s']:10.2f}")
+    save_results("micro", vars(args), results)
+
+
+if __name__ == "__main__":
+    main_cli()
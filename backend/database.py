@@ -1,7 +1,9 @@
-from sqlalchemy import create_engine, Column, String, DateTime, Integer, Text, JSON
+from sqlalchemy import create_engine, Column, String, DateTime, Integer, Text, JSON, ForeignKey, inspect, text, exists
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
+import json
+import os
 import uuid
 
 Base = declarative_base()
@@ -16,22 +18,119 @@ class ProjectDB(Base):
     keywords = Column(JSON, default=[])
     created_at = Column(DateTime, default=datetime.utcnow)
 
+class PaperDB(Base):
+    """Paper metadata, stored once per ArXiv ID and shared by every project that saves it"""
+    __tablename__ = "papers"
+
+    id = Column(String, primary_key=True)  # ArXiv ID
+    title = Column(String, nullable=False)
+    abstract = Column(Text, nullable=False)
+    url = Column(String)
+    authors = Column(JSON, default=[])
+    category = Column(String)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "PaperDB":
+        """Build a row from a Qdrant payload / ArXiv paper dict"""
+        return cls(
+            id=payload["id"],
+            title=payload["title"],
+            abstract=payload["abstract"],
+            url=payload.get("url"),
+            authors=payload.get("authors", []),
+            category=payload.get("category")
+        )
+
 class ProjectPaperDB(Base):
     __tablename__ = "project_papers"
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    project_id = Column(String, nullable=False)
-    paper_id = Column(String, nullable=False) 
-    paper_data = Column(JSON, nullable=False)  
+    project_id = Column(String, nullable=False, index=True)
+    paper_id = Column(String, ForeignKey("papers.id"), nullable=False, index=True)
     notes = Column(Text)
     added_at = Column(DateTime, default=datetime.utcnow)
 
+    paper = relationship(PaperDB, lazy="joined")
+
+class SyncWatermarkDB(Base):
+    """Newest ArXiv submission already ingested for each category"""
+    __tablename__ = "sync_watermarks"
+
+    category = Column(String, primary_key=True)
+    last_submitted = Column(DateTime, nullable=False)
+    last_paper_id = Column(String, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 # Database setup
-engine = create_engine("sqlite:///./projects.db")
+engine = create_engine(os.getenv("DATABASE_URL", "sqlite:///./projects.db"))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+    migrate_db()
+
+def migrate_db():
+    """
+    Migrate project_papers rows that embed a full paper_data JSON copy to
+    reference the shared papers table instead. No-op once migrated.
+    """
+    columns = {c["name"] for c in inspect(engine).get_columns("project_papers")}
+    if "paper_data" not in columns:
+        return
+
+    print("Migrating project_papers.paper_data into papers table...")
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE project_papers RENAME TO project_papers_old"))
+        Base.metadata.create_all(bind=conn)
+
+        rows = conn.execute(text(
+            "SELECT id, project_id, paper_id, paper_data, notes, added_at FROM project_papers_old"
+        )).mappings().all()
+
+        # Plain INSERTs (no INSERT OR REPLACE / ON CONFLICT) so this runs on any dialect
+        existing = set(conn.execute(text("SELECT id FROM papers")).scalars())
+        for row in rows:
+            paper = row["paper_data"]
+            if isinstance(paper, str):
+                paper = json.loads(paper)
+            if row["paper_id"] not in existing:
+                existing.add(row["paper_id"])
+                conn.execute(
+                    text(
+                        "INSERT INTO papers (id, title, abstract, url, authors, category, updated_at) "
+                        "VALUES (:id, :title, :abstract, :url, :authors, :category, :updated_at)"
+                    ),
+                    {
+                        "id": row["paper_id"],
+                        "title": paper["title"],
+                        "abstract": paper["abstract"],
+                        "url": paper.get("url"),
+                        "authors": json.dumps(paper.get("authors", [])),
+                        "category": paper.get("category"),
+                        "updated_at": datetime.utcnow()
+                    }
+                )
+            conn.execute(
+                text(
+                    "INSERT INTO project_papers (id, project_id, paper_id, notes, added_at) "
+                    "VALUES (:id, :project_id, :paper_id, :notes, :added_at)"
+                ),
+                {k: row[k] for k in ("id", "project_id", "paper_id", "notes", "added_at")}
+            )
+
+        conn.execute(text("DROP TABLE project_papers_old"))
+    print(f"Migrated {len(rows)} saved papers ({len({row['paper_id'] for row in rows})} unique)")
+
+def delete_orphaned_papers(db, paper_ids):
+    """Delete the given papers rows if no project saves them any more (call before committing a removal)"""
+    if not paper_ids:
+        return
+    db.flush()
+    db.query(PaperDB).filter(
+        PaperDB.id.in_(paper_ids),
+        ~exists().where(ProjectPaperDB.paper_id == PaperDB.id)
+    ).delete(synchronize_session=False)
 
 def get_db():
     db = SessionLocal()
@@ -0,0 +1,118 @@
+"""
+Shared local embedding worker.
+
+Run one embedding process per host and point every API worker at it, so
+the model is loaded once instead of once per uvicorn/gunicorn worker:
+
+    uv run python embedding_server.py            # listens on localhost:6100
+    EMBEDDING_SERVER=localhost:6100 uv run uvicorn main:app --workers 4
+
+Connections exchange pickles, so they are authenticated with a shared key:
+EMBEDDING_SERVER_AUTHKEY if set, otherwise a random key the server writes
+to EMBEDDING_SERVER_KEY_FILE (owner-only) for clients on the same host.
+"""
+import os
+import secrets
+import threading
+from multiprocessing.connection import Listener, Client
+from dotenv import load_dotenv
+
+load_dotenv()
+
+EMBEDDING_MODEL_NAME = "all-mpnet-base-v2"
+KEY_FILE = os.getenv("EMBEDDING_SERVER_KEY_FILE", ".embedding_server.key")
+
+
+def load_authkey(create: bool = False) -> bytes:
+    """
+    Shared key for the connection handshake. The server (`create=True`)
+    generates and writes one if neither the env var nor the key file exist.
+    """
+    value = os.getenv("EMBEDDING_SERVER_AUTHKEY")
+    if value:
+        return value.encode()
+    if create and not os.path.exists(KEY_FILE):
+        fd = os.open(KEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "w") as f:
+            f.write(secrets.token_hex(32))
+    try:
+        with open(KEY_FILE) as f:
+            return f.read().strip().encode()
+    except FileNotFoundError:
+        raise RuntimeError(
+            f"No embedding server key: set EMBEDDING_SERVER_AUTHKEY or start the server to create {KEY_FILE}"
+        )
+
+
+def parse_address(address: str):
+    host, port = address.rsplit(":", 1)
+    return host, int(port)
+
+
+class RemoteEmbeddingModel:
+    """Drop-in for SentenceTransformer.encode that calls the shared embedding server"""
+
+    def __init__(self, address: str):
+        self.address = parse_address(address)
+        self.authkey = load_authkey()
+        # multiprocessing connections are not thread-safe, so keep one per thread
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = Client(self.address, authkey=self.authkey)
+        return conn
+
+    def encode(self, sentences, **kwargs):
+        for attempt in range(2):
+            try:
+                conn = self._connection()
+                conn.send(("encode", sentences))
+                status, result = conn.recv()
+                break
+            except (EOFError, ConnectionError, OSError):
+                # Server restarted: reconnect once
+                self._local.conn = None
+                if attempt:
+                    raise
+        if status != "ok":
+            raise RuntimeError(f"Embedding server error: {result}")
+        return result
+
+
+def _handle(conn, model):
+    with conn:
+        while True:
+            try:
+                command, payload = conn.recv()
+            except EOFError:
+                return
+            try:
+                if command != "encode":
+                    raise ValueError(f"Unknown command: {command}")
+                conn.send(("ok", model.encode(payload)))
+            except Exception as e:
+                conn.send(("error", str(e)))
+
+
+def serve(address: str):
+    from sentence_transformers import SentenceTransformer
+
+    authkey = load_authkey(create=True)
+    print(f"Loading {EMBEDDING_MODEL_NAME}...")
+    model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+
+    with Listener(parse_address(address), authkey=authkey) as listener:
+        print(f"Embedding server listening on {address}")
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception as e:
+                print(f"Rejected embedding client: {e}")
+                continue
+            threading.Thread(target=_handle, args=(conn, model), daemon=True).start()
+
+
+if __name__ == "__main__":
+    serve(os.getenv("EMBEDDING_SERVER", "localhost:6100"))
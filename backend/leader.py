@@ -0,0 +1,56 @@
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, every process acts as leader
+    fcntl = None
+
+# Directory for lock files shared by all workers on this host
+LOCK_DIR = os.getenv("LOCK_DIR", ".")
+
+# Lock files held for the lifetime of this process, keyed by role
+_held = {}
+
+
+def _lock_path(name: str) -> str:
+    return os.path.join(LOCK_DIR, f".{name}.lock")
+
+
+@contextmanager
+def exclusive(name: str):
+    """Serialize a short critical section (e.g. schema setup) across worker processes"""
+    if fcntl is None:
+        yield
+        return
+    with open(_lock_path(name), "w") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def acquire_leadership(name: str) -> bool:
+    """
+    Try to become the single worker responsible for `name` (e.g. ingestion).
+
+    Uses a non-blocking file lock that is held until this process exits, so
+    exactly one worker wins and leadership passes on if that worker dies.
+    """
+    if name in _held:
+        return True
+    if fcntl is None:
+        return True
+
+    f = open(_lock_path(name), "w")
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return False
+
+    f.write(str(os.getpid()))
+    f.flush()
+    _held[name] = f
+    return True
@@ -0,0 +1,206 @@
+import os
+import time
+import heapq
+import random
+import asyncio
+import itertools
+import threading
+from enum import IntEnum
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+from dotenv import load_dotenv
+import metrics
+from metrics import timed
+
+load_dotenv()
+
+
+class Priority(IntEnum):
+    """Lower values are served first when the rate limiter is saturated"""
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+class LLMRateLimited(Exception):
+    """Raised when a call waits longer than the queue timeout for a rate-limit token"""
+
+
+@dataclass
+class LLMResult:
+    text: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+class GeminiProvider:
+    """Calls Gemini through one shared GenerativeModel"""
+
+    RETRYABLE = (
+        google_exceptions.TooManyRequests,
+        google_exceptions.ResourceExhausted,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.InternalServerError,
+        google_exceptions.DeadlineExceeded,
+        TimeoutError,
+    )
+
+    def __init__(self, model_name: str, api_key: str = None):
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model_name)
+
+    def generate(self, prompt: str, timeout: float) -> LLMResult:
+        response = self.model.generate_content(prompt, request_options={"timeout": timeout})
+        usage = getattr(response, "usage_metadata", None)
+        return LLMResult(
+            text=response.text,
+            prompt_tokens=getattr(usage, "prompt_token_count", 0) or 0,
+            completion_tokens=getattr(usage, "candidates_token_count", 0) or 0
+        )
+
+    def is_retryable(self, error: Exception) -> bool:
+        return isinstance(error, self.RETRYABLE)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket where waiting callers are served in priority order.
+    A background caller never takes a token while an interactive caller is waiting.
+    """
+
+    def __init__(self, rate_per_second: float, capacity: float):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._cond = threading.Condition()
+        self._waiters = []
+        self._seq = itertools.count()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, priority: int = Priority.INTERACTIVE, timeout: float = None) -> bool:
+        """Take one token, waiting up to timeout seconds (None waits forever)"""
+        entry = (priority, next(self._seq))
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    self._refill()
+                    if self._waiters[0] == entry and self.tokens >= 1:
+                        self.tokens -= 1
+                        return True
+
+                    # Wake up when the next token should be available, or when notified
+                    delay = (1 - self.tokens) / self.rate if self.tokens < 1 else 0.05
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            return False
+                        delay = min(delay, remaining)
+                    self._cond.wait(max(delay, 0.001))
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+
+class LLMGateway:
+    """
+    Single entry point for LLM calls: rate limiting, timeouts, jittered
+    retries, optional hedging for interactive calls, and metrics.
+    """
+
+    def __init__(
+        self,
+        provider,
+        requests_per_minute: float = 60,
+        burst: int = 10,
+        timeout: float = 30.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        queue_timeout: float = 60.0,
+        hedge_after: float = None,
+        max_workers: int = 16
+    ):
+        self.provider = provider
+        self.bucket = TokenBucket(requests_per_minute / 60.0, burst)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.queue_timeout = queue_timeout
+        self.hedge_after = hedge_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm")
+
+    def generate(self, prompt: str, priority: Priority = Priority.INTERACTIVE, purpose: str = "generate") -> str:
+        """Generate a completion, retrying transient provider errors with jittered backoff"""
+        with timed(f"llm_{purpose}"):
+            for attempt in range(self.max_retries + 1):
+                if attempt:
+                    # Full jitter: spread retries out so a burst of 429s does not retry in lockstep
+                    time.sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt)))
+                    metrics.inc("dora_llm_retries_total", purpose=purpose)
+                try:
+                    result = self._call(prompt, priority, purpose)
+                    metrics.record_llm_usage(purpose, result.prompt_tokens, result.completion_tokens)
+                    return result.text
+                except Exception as e:
+                    if attempt == self.max_retries or not self.provider.is_retryable(e):
+                        raise
+                    print(f"LLM {purpose} call failed ({e}), retrying...")
+
+    async def agenerate(self, prompt: str, priority: Priority = Priority.INTERACTIVE, purpose: str = "generate") -> str:
+        """Async wrapper that keeps the event loop free while waiting on the LLM"""
+        return await asyncio.to_thread(self.generate, prompt, priority, purpose)
+
+    def _acquire(self, priority: Priority, purpose: str):
+        start = time.perf_counter()
+        acquired = self.bucket.acquire(priority, timeout=self.queue_timeout)
+        metrics.observe("dora_llm_queue_wait_seconds", time.perf_counter() - start, purpose=purpose)
+        if not acquired:
+            raise LLMRateLimited(f"Timed out waiting {self.queue_timeout}s for LLM capacity")
+
+    def _call(self, prompt: str, priority: Priority, purpose: str) -> LLMResult:
+        self._acquire(priority, purpose)
+        if self.hedge_after is None or priority != Priority.INTERACTIVE:
+            return self.provider.generate(prompt, self.timeout)
+
+        # Hedged request: if the first call is slow, race a second one and take whichever finishes first
+        futures = [self._executor.submit(self.provider.generate, prompt, self.timeout)]
+        done, _ = wait(futures, timeout=self.hedge_after)
+        if not done and self.bucket.acquire(priority, timeout=0):
+            metrics.inc("dora_llm_hedges_total", purpose=purpose)
+            futures.append(self._executor.submit(self.provider.generate, prompt, self.timeout))
+
+        pending = set(futures)
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+
+
+def _env_float(name: str, default: float = None):
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+llm_gateway = LLMGateway(
+    GeminiProvider(os.getenv("LLM_MODEL", "gemini-2.5-flash"), api_key=os.getenv("GEMINI_API_KEY")),
+    requests_per_minute=_env_float("LLM_REQUESTS_PER_MINUTE", 60),
+    burst=int(_env_float("LLM_BURST", 10)),
+    timeout=_env_float("LLM_TIMEOUT", 30.0),
+    max_retries=int(_env_float("LLM_MAX_RETRIES", 3)),
+    queue_timeout=_env_float("LLM_QUEUE_TIMEOUT", 60.0),
+    hedge_after=_env_float("LLM_HEDGE_AFTER")
+)
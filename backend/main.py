@@ -1,27 +1,39 @@
 import os
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from models import (
     SearchRequest, RankRequest, RankResponse, PaperResult, SearchResponse,
+    BatchSearchRequest, BatchSearchResponse,
     ProjectCreate, Project, AddPaperToProject,
-    RAGRequest, RAGResponse, SummarizeResponse
+    RAGRequest, RAGResponse, SummarizeResponse,
+    ResponseShape, LEAN_PAPER_FIELDS, LEAN_RANKED_PAPER_FIELDS, LEAN_ABSTRACT_CHARS
 )
-from database import init_db, get_db, ProjectDB, ProjectPaperDB
-from populate import populate_by_categories
+from database import init_db, get_db, delete_orphaned_papers, ProjectDB, ProjectPaperDB, PaperDB
+from populate import sync_categories, sync_periodically
 from dotenv import load_dotenv
 from qdrant import (
-    ensure_collection, get_embedding, qdrant
+    ensure_collection, get_embedding, get_embeddings, get_embedding_model, build_search_filter, qdrant
 )
-import google.generativeai as genai
+from qdrant_client.models import QueryRequest, Filter, FieldCondition, MatchValue
 from datetime import datetime
+import time
 import uuid
+import hmac
+import asyncio
+import metrics
+from metrics import timed
+from llm import llm_gateway, Priority
+from responses import FastJSONResponse
+from leader import exclusive, acquire_leadership
+from answer_cache import answer_cache
 
 load_dotenv()
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 
 app = FastAPI(title="ArXiv Research Assistant API")
 
@@ -33,14 +45,53 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
+
 qdrant_client = qdrant
 
+@app.middleware("http")
+async def record_request_timings(request: Request, call_next):
+    """Record per-request latency and expose stage timings as Server-Timing"""
+    timings, token = metrics.start_request_timings()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        total = time.perf_counter() - start
+        metrics.end_request_timings(token)
+        # Label by route template; unmatched paths share one label so 404 scans can't add series
+        route = request.scope.get("route")
+        label = route.path if route is not None else "unmatched"
+        metrics.observe("dora_http_request_duration_seconds", total, method=request.method, route=label)
+        metrics.inc("dora_http_requests_total", method=request.method, route=label, status=status)
+        metrics.maybe_profile(request.method, request.url.path, status, total, timings)
+    response.headers["Server-Timing"] = metrics.server_timing_header(timings, total)
+    return response
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize database and Qdrant on startup"""
-    init_db()
-    ensure_collection()
-    populate_by_categories()
+    # Serialize schema setup so concurrent workers don't race on migrations
+    with exclusive("init"):
+        init_db()
+        ensure_collection()
+
+    metrics.start_flushing()
+
+    # Load the embedding model now rather than on the first search request
+    get_embedding_model()
+
+    # Only one worker harvests and embeds ArXiv papers; the rest serve straight away
+    if acquire_leadership("ingestion"):
+        sync_categories()
+        interval = float(os.getenv("SYNC_INTERVAL_MINUTES", "0"))
+        if interval > 0:
+            print(f"Scheduling ArXiv delta sync every {interval} minutes")
+            app.state.sync_task = asyncio.create_task(sync_periodically(interval * 60))
+    else:
+        print("Another worker is running ingestion, skipping")
     print("Server ready!")
 
 
@@ -114,14 +165,26 @@ def delete_project(project_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Project not found")
     
     # Delete all papers associated with this project
+    paper_ids = [paper_id for (paper_id,) in db.query(ProjectPaperDB.paper_id).filter(
+        ProjectPaperDB.project_id == project_id
+    )]
     db.query(ProjectPaperDB).filter(ProjectPaperDB.project_id == project_id).delete()
+    delete_orphaned_papers(db, paper_ids)
     
     # Delete the project
     db.delete(project)
     db.commit()
+    answer_cache.invalidate_project(project_id)
     
     return {"message": "Project deleted successfully"}
 
+def saved_with_papers(saved_papers):
+    """Skip project links whose shared papers row is missing instead of failing the whole project"""
+    for saved_paper in saved_papers:
+        if saved_paper.paper is None:
+            print(f"Skipping saved paper {saved_paper.paper_id}: papers row is missing")
+    return [saved_paper for saved_paper in saved_papers if saved_paper.paper is not None]
+
 @app.get("/projects/{project_id}/papers", response_model=List[PaperResult])
 def get_project_papers(project_id: str, db: Session = Depends(get_db)):
     """Get all papers saved to a project"""
@@ -132,14 +195,13 @@ def get_project_papers(project_id: str, db: Session = Depends(get_db)):
     papers = db.query(ProjectPaperDB).filter(ProjectPaperDB.project_id == project_id).all()
     
     result = []
-    for p in papers:
-        paper_data = p.paper_data
+    for p in saved_with_papers(papers):
         result.append(PaperResult(
-            id=paper_data["id"],
-            title=paper_data["title"],
-            abstract=paper_data["abstract"],
-            url=paper_data["url"],
-            authors=paper_data["authors"],
+            id=p.paper.id,
+            title=p.paper.title,
+            abstract=p.paper.abstract,
+            url=p.paper.url,
+            authors=p.paper.authors,
             vector_score=0.0,
             is_saved=True
         ))
@@ -147,40 +209,119 @@ def get_project_papers(project_id: str, db: Session = Depends(get_db)):
     return result
 
 
+def paper_from_point(point, saved_paper_ids) -> dict:
+    """Search hit as a plain dict with PaperResult's fields (no model validation on the hot path)"""
+    payload = point.payload
+    paper_id = payload.get("id")
+    return {
+        "id": paper_id,
+        "title": payload.get("title"),
+        "abstract": payload.get("abstract"),
+        "url": payload.get("url"),
+        "authors": payload.get("authors", []),
+        "vector_score": point.score,
+        "relevance_score": None,
+        "relevance_explanation": None,
+        "is_saved": paper_id in saved_paper_ids
+    }
+
+def shape_papers(papers: List[dict], shape: ResponseShape, lean_fields=LEAN_PAPER_FIELDS) -> List[dict]:
+    """Apply lean mode, field selection and abstract truncation to search results"""
+    fields = shape.fields or (lean_fields if shape.lean else None)
+    max_chars = shape.abstract_max_chars
+    if max_chars is None and shape.lean:
+        max_chars = LEAN_ABSTRACT_CHARS
+    keys = ["id"] + [f for f in fields if f != "id"] if fields else None
+
+    result = []
+    for paper in papers:
+        data = {key: paper[key] for key in keys} if keys else dict(paper)
+        abstract = data.get("abstract")
+        if max_chars is not None and abstract and len(abstract) > max_chars:
+            data["abstract"] = abstract[:max_chars].rstrip() + "..."
+        result.append(data)
+    return result
+
 @app.post("/papers/search", response_model=SearchResponse)
 def search_papers(req: SearchRequest, db: Session = Depends(get_db)):
     """Vector search to find relevant papers from global collection"""
     try:
         query_vector = get_embedding(req.query)
 
-        results = qdrant_client.query_points(
-            collection_name="all_papers",
-            query=query_vector,
-            limit=req.top_k
-        )
+        with timed("qdrant_query"):
+            results = qdrant_client.query_points(
+                collection_name="all_papers",
+                query=query_vector,
+                query_filter=build_search_filter(req),
+                limit=req.top_k
+            )
 
         # Get saved paper IDs for this project if provided
         saved_paper_ids = set()
         if req.project_id:
-            saved_papers = db.query(ProjectPaperDB).filter(
-                ProjectPaperDB.project_id == req.project_id
-            ).all()
-            saved_paper_ids = {p.paper_id for p in saved_papers}
+            with timed("sqlite"):
+                saved_papers = db.query(ProjectPaperDB.paper_id).filter(
+                    ProjectPaperDB.project_id == req.project_id
+                ).all()
+            saved_paper_ids = {paper_id for (paper_id,) in saved_papers}
 
-        papers = []
-        for point in results.points:
-            paper_id = point.payload.get("id")
-            papers.append(PaperResult(
-                id=paper_id,
-                title=point.payload.get("title"),
-                abstract=point.payload.get("abstract"),
-                url=point.payload.get("url"),
-                authors=point.payload.get("authors", []),
-                vector_score=point.score,
-                is_saved=(paper_id in saved_paper_ids)
-            ))
+        papers = [paper_from_point(point, saved_paper_ids) for point in results.points]
+
+        return FastJSONResponse({"all_papers": shape_papers(papers, req)})
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/papers/search_batch", response_model=BatchSearchResponse)
+def search_papers_batch(req: BatchSearchRequest, db: Session = Depends(get_db)):
+    """
+    Run several vector searches in one round-trip: one batched encode,
+    one Qdrant batch query and one saved-paper lookup for all queries.
+    """
+    try:
+        query_vectors = get_embeddings(req.queries)
+        query_filter = build_search_filter(req)
+
+        with timed("qdrant_query"):
+            batch_results = qdrant_client.query_batch_points(
+                collection_name="all_papers",
+                requests=[
+                    QueryRequest(query=vector, filter=query_filter, limit=req.top_k, with_payload=True)
+                    for vector in query_vectors
+                ]
+            )
+
+        saved_paper_ids = set()
+        if req.project_id:
+            with timed("sqlite"):
+                saved_papers = db.query(ProjectPaperDB.paper_id).filter(
+                    ProjectPaperDB.project_id == req.project_id
+                ).all()
+            saved_paper_ids = {paper_id for (paper_id,) in saved_papers}
+
+        results = []
+        merged = {}
+        for query, response in zip(req.queries, batch_results):
+            papers = []
+            for point in response.points:
+                paper = paper_from_point(point, saved_paper_ids)
+                papers.append(paper)
+                # Keep each paper's best score across queries
+                paper_id = paper["id"]
+                if paper_id not in merged or paper["vector_score"] > merged[paper_id]["vector_score"]:
+                    merged[paper_id] = paper
+            results.append((query, papers))
+
+        merged_papers = None
+        if req.merge:
+            merged_papers = shape_papers(
+                sorted(merged.values(), key=lambda p: p["vector_score"], reverse=True), req
+            )
 
-        return SearchResponse(all_papers=papers)
+        return FastJSONResponse({
+            "results": [{"query": query, "papers": shape_papers(papers, req)} for query, papers in results],
+            "merged_papers": merged_papers
+        })
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -189,40 +330,29 @@ def search_papers(req: SearchRequest, db: Session = Depends(get_db)):
 def search_and_rank_papers(req: RankRequest, db: Session = Depends(get_db)):
     """Search and rank papers based on project context"""
     try:
-        # Get project context
-        project = db.query(ProjectDB).filter(ProjectDB.id == req.project_id).first()
+        # Get project context and saved paper IDs
+        with timed("sqlite"):
+            project = db.query(ProjectDB).filter(ProjectDB.id == req.project_id).first()
+            saved_papers = db.query(ProjectPaperDB.paper_id).filter(
+                ProjectPaperDB.project_id == req.project_id
+            ).all()
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
-        
-        # Get saved paper IDs
-        saved_papers = db.query(ProjectPaperDB).filter(
-            ProjectPaperDB.project_id == req.project_id
-        ).all()
-        saved_paper_ids = {p.paper_id for p in saved_papers}
+        saved_paper_ids = {paper_id for (paper_id,) in saved_papers}
         
         # Step 1: Vector search
         query_vector = get_embedding(req.query)
         
-        results = qdrant_client.query_points(
-            collection_name="all_papers",
-            query=query_vector,
-            limit=req.top_k
-        )
-        
-        # Step 2: Convert to Pydantic models
-        papers = []
-        for point in results.points:
-            paper_id = point.payload.get("id")
-            paper = PaperResult(
-                id=paper_id,
-                title=point.payload.get("title"),
-                abstract=point.payload.get("abstract"),
-                url=point.payload.get("url"),
-                authors=point.payload.get("authors", []),
-                vector_score=point.score,
-                is_saved=(paper_id in saved_paper_ids)
+        with timed("qdrant_query"):
+            results = qdrant_client.query_points(
+                collection_name="all_papers",
+                query=query_vector,
+                query_filter=build_search_filter(req),
+                limit=req.top_k
             )
-            papers.append(paper)
+        
+        # Step 2: Convert to result dicts
+        papers = [paper_from_point(point, saved_paper_ids) for point in results.points]
         
         # Step 3: Re-rank with Gemini using project context
         papers_to_rerank = papers[:req.rerank_top_n]
@@ -247,8 +377,8 @@ Rate how relevant this research paper is to the project on a scale of 0-100, whe
 - 50 = Somewhat relevant
 - 100 = Highly relevant and directly applicable
 
-Paper Title: {paper.title}
-Paper Abstract: {paper.abstract}
+Paper Title: {paper["title"]}
+Paper Abstract: {paper["abstract"]}
 
 Respond with ONLY a number between 0-100, followed by a brief one-sentence explanation.
 Format to respond with: SCORE|EXPLANATION, where SCORE is the numerical score
@@ -256,42 +386,42 @@ Example Response: 85|This paper directly addresses the privacy-preserving techni
 """
             
             try:
-                model = genai.GenerativeModel('gemini-2.5-flash')
-                response = model.generate_content(prompt)
-                response_text = response.text.strip()
+                response_text = llm_gateway.generate(
+                    prompt, priority=Priority.BACKGROUND, purpose="rerank"
+                ).strip()
                 
                 if "|" in response_text:
                     score_str, explanation = response_text.split("|", 1)
-                    paper.relevance_score = float(score_str.strip())
-                    paper.relevance_explanation = explanation.strip()
+                    paper["relevance_score"] = float(score_str.strip())
+                    paper["relevance_explanation"] = explanation.strip()
                 else:
-                    paper.relevance_score = float(response_text.strip().split()[0])
-                    paper.relevance_explanation = "No explanation provided"
+                    paper["relevance_score"] = float(response_text.strip().split()[0])
+                    paper["relevance_explanation"] = "No explanation provided"
                 
                 ranked_papers.append(paper)
                 
             except Exception as e:
-                print(f"Error ranking paper {paper.id}: {e}")
-                paper.relevance_score = paper.vector_score * 100
-                paper.relevance_explanation = "Auto-scored based on vector similarity"
+                print(f"Error ranking paper {paper['id']}: {e}")
+                paper["relevance_score"] = paper["vector_score"] * 100
+                paper["relevance_explanation"] = "Auto-scored based on vector similarity"
                 ranked_papers.append(paper)
         
         # Step 4: Add remaining papers
         remaining_papers = papers[req.rerank_top_n:]
         for paper in remaining_papers:
-            paper.relevance_score = paper.vector_score * 100
-            paper.relevance_explanation = "Not re-ranked (outside top N)"
+            paper["relevance_score"] = paper["vector_score"] * 100
+            paper["relevance_explanation"] = "Not re-ranked (outside top N)"
             ranked_papers.append(paper)
         
         # Step 5: Sort by relevance
-        ranked_papers.sort(key=lambda x: x.relevance_score or 0, reverse=True)
+        ranked_papers.sort(key=lambda x: x["relevance_score"] or 0, reverse=True)
         
-        return RankResponse(
-            query=req.query,
-            project_context=full_context,
-            ranked_papers=ranked_papers,
-            total_results=len(ranked_papers)
-        )
+        return FastJSONResponse({
+            "query": req.query,
+            "project_context": full_context if req.include_context and not req.lean else None,
+            "ranked_papers": shape_papers(ranked_papers, req, LEAN_RANKED_PAPER_FIELDS),
+            "total_results": len(ranked_papers)
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -317,14 +447,9 @@ def add_paper_to_project(project_id: str, req: AddPaperToProject, db: Session =
     try:
         results = qdrant_client.scroll(
             collection_name="all_papers",
-            scroll_filter={
-                "must": [
-                    {
-                        "key": "id",
-                        "match": {"value": req.paper_id}
-                    }
-                ]
-            },
+            scroll_filter=Filter(must=[
+                FieldCondition(key="id", match=MatchValue(value=req.paper_id))
+            ]),
             limit=1
         )
         
@@ -337,15 +462,20 @@ def add_paper_to_project(project_id: str, req: AddPaperToProject, db: Session =
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching paper: {str(e)}")
     
-    # Add to project
+    # Store (or refresh) the shared paper row once, then link it to the project
+    paper = db.merge(PaperDB.from_payload(paper_data))
     db_paper = ProjectPaperDB(
         id=str(uuid.uuid4()),
         project_id=project_id,
         paper_id=req.paper_id,
-        paper_data=paper_data,
         notes=req.notes
     )
     db.add(db_paper)
+    db.flush()
+    # A concurrent unsave may have swept the row merge() saw; we now hold the write lock, so restore it
+    if db.query(PaperDB.id).filter(PaperDB.id == req.paper_id).first() is None:
+        db.expunge(paper)
+        db.add(PaperDB.from_payload(paper_data))
     db.commit()
     
     return {"message": "Paper added to project successfully", "paper_id": req.paper_id}
@@ -362,6 +492,7 @@ def remove_paper_from_project(project_id: str, paper_id: str, db: Session = Depe
         raise HTTPException(status_code=404, detail="Paper not found in project")
     
     db.delete(paper)
+    delete_orphaned_papers(db, [paper_id])
     db.commit()
     
     return {"message": "Paper removed from project"}
@@ -380,7 +511,8 @@ async def ask_question_rag(req: RAGRequest, db: Session = Depends(get_db)):
         # Get project context if provided
         project_context = ""
         if req.project_id:
-            project = db.query(ProjectDB).filter(ProjectDB.id == req.project_id).first()
+            with timed("sqlite"):
+                project = db.query(ProjectDB).filter(ProjectDB.id == req.project_id).first()
             if project:
                 project_context = f"""
 Project Context:
@@ -394,11 +526,13 @@ Project Context:
         print(f"Searching for papers relevant to: {req.question}")
         query_vector = get_embedding(req.question)
         
-        results = qdrant_client.query_points(
-            collection_name="all_papers",
-            query=query_vector,
-            limit=req.num_papers
-        )
+        with timed("qdrant_query"):
+            results = qdrant_client.query_points(
+                collection_name="all_papers",
+                query=query_vector,
+                query_filter=build_search_filter(req),
+                limit=req.num_papers
+            )
         
         if not results.points:
             raise HTTPException(status_code=404, detail="No relevant papers found")
@@ -427,6 +561,20 @@ Project Context:
                 Abstract: {paper['abstract']}
             """)
         
+        # Reuse a cached answer for a near-identical question over the same sources
+        source_ids = [source.id for source in sources]
+        if req.use_cache:
+            cached = answer_cache.lookup(req.project_id, project_context, query_vector, source_ids)
+            if cached:
+                print(f"Serving cached answer (originally for: {cached.question})")
+                return RAGResponse(
+                    question=req.question,
+                    answer=cached.answer,
+                    sources=sources,
+                    project_context=project_context if project_context else None,
+                    cached=True
+                )
+        
         # Step 3: Augmented Generation - Send papers to LLM as context
         context = "\n" + "="*80 + "\n".join(paper_contexts)
         
@@ -450,14 +598,17 @@ Instructions:
 
 Answer:"""
         
+        # Return the pooled connection while awaiting the LLM so concurrent requests don't exhaust the pool
+        db.close()
+
         # Generate answer using Gemini
         print("Generating answer with Gemini...")
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        response = model.generate_content(prompt)
+        answer = await llm_gateway.agenerate(prompt, priority=Priority.INTERACTIVE, purpose="rag")
+        answer_cache.store(req.project_id, project_context, query_vector, source_ids, req.question, answer)
         
         return RAGResponse(
             question=req.question,
-            answer=response.text,
+            answer=answer,
             sources=sources,
             project_context=project_context if project_context else None
         )
@@ -474,16 +625,15 @@ async def summarize_project_papers(project_id: str, focus: Optional[str] = None,
     Useful for getting an overview of your research collection.
     """
     try:
-        # Get project
-        project = db.query(ProjectDB).filter(ProjectDB.id == project_id).first()
+        # Get project and saved papers
+        with timed("sqlite"):
+            project = db.query(ProjectDB).filter(ProjectDB.id == project_id).first()
+            saved_papers = saved_with_papers(db.query(ProjectPaperDB).filter(
+                ProjectPaperDB.project_id == project_id
+            ).all())
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
         
-        # Get saved papers
-        saved_papers = db.query(ProjectPaperDB).filter(
-            ProjectPaperDB.project_id == project_id
-        ).all()
-        
         if not saved_papers:
             raise HTTPException(status_code=404, detail="No papers saved to this project")
         
@@ -492,22 +642,22 @@ async def summarize_project_papers(project_id: str, focus: Optional[str] = None,
         paper_contexts = []
         
         for saved_paper in saved_papers:
-            paper = saved_paper.paper_data
+            paper = saved_paper.paper
             papers.append(PaperResult(
-                id=paper["id"],
-                title=paper["title"],
-                abstract=paper["abstract"],
-                url=paper["url"],
-                authors=paper["authors"],
+                id=paper.id,
+                title=paper.title,
+                abstract=paper.abstract,
+                url=paper.url,
+                authors=paper.authors,
                 vector_score=0.0,
                 is_saved=True
             ))
             
             paper_contexts.append(f"""
-Paper: {paper['title']}
-Authors: {', '.join(paper['authors'][:3])}{"..." if len(paper['authors']) > 3 else ""}
-ArXiv ID: {paper['id']}
-Abstract: {paper['abstract']}
+Paper: {paper.title}
+Authors: {', '.join(paper.authors[:3])}{"..." if len(paper.authors) > 3 else ""}
+ArXiv ID: {paper.id}
+Abstract: {paper.abstract}
 Notes: {saved_paper.notes if saved_paper.notes else 'None'}
 """)
         
@@ -538,13 +688,15 @@ Instructions:
 
 Summary:"""
         
+        # Return the pooled connection while awaiting the LLM so concurrent requests don't exhaust the pool
+        db.close()
+
         # Generate summary
         print(f"Summarizing {len(papers)} papers for project {project.name}...")
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        response = model.generate_content(prompt)
+        summary = await llm_gateway.agenerate(prompt, priority=Priority.BACKGROUND, purpose="summarize")
         
         return SummarizeResponse(
-            summary=response.text,
+            summary=summary,
             papers_summarized=papers
         )
         
@@ -562,13 +714,36 @@ def read_root():
         "endpoints": {
             "projects": "/projects",
             "search": "/papers/search",
+            "batch_search": "/papers/search_batch",
             "smart_search": "/papers/search_and_rank",
             "ask_question": "/papers/ask",
             "summarize_saved": "/projects/{project_id}/summarize_saved",
-            "admin": "/admin/populate_by_categories"
+            "admin": "/admin/sync",
+            "metrics": "/metrics"
         }
     }
 
+def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """Admin endpoints need an X-Admin-Token header matching ADMIN_TOKEN (disabled if unset)"""
+    expected = os.getenv("ADMIN_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN is not set)")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), expected.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+@app.post("/admin/sync", dependencies=[Depends(require_admin_token)])
+async def sync_arxiv():
+    """Fetch, embed and upsert ArXiv submissions newer than each category's watermark"""
+    try:
+        return await asyncio.to_thread(sync_categories)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus-format latency, error, token and ingestion metrics"""
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
 @app.get("/health")
 def health_check():
     """Health check endpoint"""
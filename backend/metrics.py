@@ -0,0 +1,273 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from collections import defaultdict
+
+# Latency buckets in seconds, from fast SQLite reads up to slow Gemini calls
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Requests slower than this (in ms) are handed to the profile hooks; unset disables profiling
+PROFILE_SLOW_REQUEST_MS = os.getenv("PROFILE_SLOW_REQUEST_MS")
+
+# With several workers, each one writes its metrics here and /metrics merges them all.
+# Like prometheus_client's multiprocess mode, empty this directory when the server restarts.
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR")
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+
+_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_histograms = {}
+_counters = defaultdict(float)
+_gauges = {}
+_profile_hooks = []
+
+# Stage timings for the request currently being served, used for Server-Timing headers
+_request_timings: ContextVar = ContextVar("request_timings", default=None)
+
+
+class _Histogram:
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def observe(name: str, value: float, **labels):
+    """Record a value in a latency histogram"""
+    key = (name, _label_key(labels))
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = _Histogram()
+        hist.observe(value)
+
+
+def inc(name: str, amount: float = 1, **labels):
+    """Increment a counter"""
+    with _lock:
+        _counters[(name, _label_key(labels))] += amount
+
+
+def set_gauge(name: str, value: float, **labels):
+    """Set a gauge to the given value"""
+    with _lock:
+        _gauges[(name, _label_key(labels))] = value
+
+
+@contextmanager
+def timed(stage: str):
+    """
+    Time a hot-path stage (embedding, qdrant, sqlite, llm, ...).
+
+    Records the latency histogram, call and error counts, and appends
+    the duration to the current request's Server-Timing entries.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        inc("dora_stage_errors_total", stage=stage)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        observe("dora_stage_latency_seconds", elapsed, stage=stage)
+        inc("dora_stage_calls_total", stage=stage)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((stage, elapsed))
+
+
+def record_llm_usage(purpose: str, prompt_tokens: int, completion_tokens: int):
+    """Record prompt/completion token counts for an LLM call"""
+    inc("dora_llm_tokens_total", prompt_tokens, purpose=purpose, kind="prompt")
+    inc("dora_llm_tokens_total", completion_tokens, purpose=purpose, kind="completion")
+
+
+def record_ingestion(num_papers: int, seconds: float):
+    """Record ingestion throughput for a populate_qdrant run"""
+    inc("dora_papers_ingested_total", num_papers)
+    if seconds > 0:
+        set_gauge("dora_ingestion_papers_per_second", num_papers / seconds)
+
+
+def start_request_timings():
+    """Begin collecting stage timings for the current request"""
+    timings = []
+    return timings, _request_timings.set(timings)
+
+
+def end_request_timings(token):
+    _request_timings.reset(token)
+
+
+def server_timing_header(timings, total: float) -> str:
+    """Build a Server-Timing header value, summing repeated stages"""
+    totals = defaultdict(float)
+    counts = defaultdict(int)
+    for stage, elapsed in timings:
+        totals[stage] += elapsed
+        counts[stage] += 1
+    parts = [
+        f'{stage};dur={totals[stage] * 1000:.1f};desc="{counts[stage]}x"'
+        for stage in totals
+    ]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def register_profile_hook(hook):
+    """
+    Register a callable invoked as hook(method, path, status, total, timings)
+    for requests slower than PROFILE_SLOW_REQUEST_MS.
+    """
+    _profile_hooks.append(hook)
+
+
+def print_profile(method, path, status, total, timings):
+    """Default profile hook: print the stage breakdown of a slow request"""
+    breakdown = ", ".join(f"{stage}={elapsed * 1000:.1f}ms" for stage, elapsed in timings)
+    print(f"Slow request {method} {path} -> {status} in {total * 1000:.1f}ms [{breakdown}]")
+
+
+def maybe_profile(method, path, status, total, timings):
+    if PROFILE_SLOW_REQUEST_MS is None or total * 1000 < float(PROFILE_SLOW_REQUEST_MS):
+        return
+    for hook in _profile_hooks or [print_profile]:
+        try:
+            hook(method, path, status, total, timings)
+        except Exception as e:
+            print(f"Error in profile hook: {e}")
+
+
+def _escape_label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels, extra=None) -> str:
+    items = list(labels) + (extra or [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label_value(v)}"' for k, v in items) + "}"
+
+
+def _snapshot() -> dict:
+    with _lock:
+        return {
+            "histograms": [[name, labels, hist.buckets, hist.count, hist.sum] for (name, labels), hist in _histograms.items()],
+            "counters": [[name, labels, value] for (name, labels), value in _counters.items()],
+            "gauges": [[name, labels, value] for (name, labels), value in _gauges.items()]
+        }
+
+
+def flush():
+    """Write this worker's metrics to METRICS_MULTIPROC_DIR (no-op when unset)"""
+    if not METRICS_MULTIPROC_DIR:
+        return
+    os.makedirs(METRICS_MULTIPROC_DIR, exist_ok=True)
+    path = os.path.join(METRICS_MULTIPROC_DIR, f"metrics-{os.getpid()}.json")
+    with _flush_lock:
+        with open(path + ".tmp", "w") as f:
+            json.dump(_snapshot(), f)
+        os.replace(path + ".tmp", path)
+
+
+def start_flushing():
+    """
+    Periodically flush this worker's metrics so any worker can serve the
+    combined /metrics. Call once per worker process after it has started.
+    """
+    if not METRICS_MULTIPROC_DIR:
+        return
+
+    def loop():
+        while True:
+            time.sleep(METRICS_FLUSH_SECONDS)
+            try:
+                flush()
+            except OSError as e:
+                print(f"Error flushing metrics: {e}")
+
+    threading.Thread(target=loop, daemon=True).start()
+
+
+def _merged_snapshots() -> tuple:
+    """
+    Combine every worker's flushed metrics into (histograms, counters, gauges)
+    dicts keyed like the in-process registry. Counters and histograms are
+    summed (including exited workers, so totals never go backwards); gauges
+    are per-process values and get a `worker` label instead.
+    """
+    flush()
+    histograms, counters, gauges = {}, defaultdict(float), {}
+    for filename in os.listdir(METRICS_MULTIPROC_DIR):
+        if not (filename.startswith("metrics-") and filename.endswith(".json")):
+            continue
+        worker = filename[len("metrics-"):-len(".json")]
+        try:
+            with open(os.path.join(METRICS_MULTIPROC_DIR, filename)) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for name, labels, buckets, count, total in snapshot["histograms"]:
+            key = (name, tuple(map(tuple, labels)))
+            hist = histograms.get(key)
+            if hist is None:
+                hist = histograms[key] = _Histogram()
+            hist.buckets = [a + b for a, b in zip(hist.buckets, buckets)]
+            hist.count += count
+            hist.sum += total
+        for name, labels, value in snapshot["counters"]:
+            counters[(name, tuple(map(tuple, labels)))] += value
+        for name, labels, value in snapshot["gauges"]:
+            gauges[(name, _label_key(dict(labels, worker=worker)))] = value
+    return histograms, counters, gauges
+
+
+def render_prometheus() -> str:
+    """Render all metrics in the Prometheus text exposition format"""
+    if METRICS_MULTIPROC_DIR:
+        return _render(*_merged_snapshots())
+    with _lock:
+        return _render(_histograms, _counters, _gauges)
+
+
+def _render(histograms, counters, gauges) -> str:
+    lines = []
+    seen = set()
+    for (name, labels), hist in sorted(histograms.items()):
+        if name not in seen:
+            lines.append(f"# TYPE {name} histogram")
+            seen.add(name)
+        for bound, count in zip(LATENCY_BUCKETS, hist.buckets):
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {count}")
+        lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {hist.count}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {hist.sum}")
+        lines.append(f"{name}_count{_format_labels(labels)} {hist.count}")
+
+    for (name, labels), value in sorted(counters.items()):
+        if name not in seen:
+            lines.append(f"# TYPE {name} counter")
+            seen.add(name)
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+
+    for (name, labels), value in sorted(gauges.items()):
+        if name not in seen:
+            lines.append(f"# TYPE {name} gauge")
+            seen.add(name)
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+
+    return "\n".join(lines) + "\n"
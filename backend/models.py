@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Optional, Literal
 from datetime import datetime
 
 class Settings(BaseSettings):
@@ -49,37 +49,87 @@ class AddPaperToProject(BaseModel):
     notes: Optional[str] = None
 
 # Search Models
-class SearchRequest(BaseModel):
+PaperField = Literal[
+    "id", "title", "abstract", "url", "authors", "vector_score",
+    "relevance_score", "relevance_explanation", "is_saved"
+]
+
+# Fields and abstract length returned when a search request sets lean=True
+LEAN_PAPER_FIELDS = ["id", "title", "url", "vector_score", "is_saved"]
+LEAN_RANKED_PAPER_FIELDS = LEAN_PAPER_FIELDS + ["relevance_score", "relevance_explanation"]
+LEAN_ABSTRACT_CHARS = 300
+
+class ResponseShape(BaseModel):
+    lean: bool = Field(default=False, description="Return a compact response (lean fields, short abstracts, no echoed context)")
+    fields: Optional[List[PaperField]] = Field(default=None, description="Only return these paper fields (id is always included)")
+    abstract_max_chars: Optional[int] = Field(default=None, ge=0, description="Truncate abstracts to this many characters")
+
+class SearchFilters(BaseModel):
+    categories: Optional[List[str]] = Field(default=None, description="Only return papers in these ArXiv categories")
+    authors: Optional[List[str]] = Field(default=None, description="Only return papers by any of these authors (exact name)")
+    published_after: Optional[datetime] = Field(default=None, description="Only return papers submitted on or after this time")
+    published_before: Optional[datetime] = Field(default=None, description="Only return papers submitted on or before this time")
+
+class SearchRequest(ResponseShape, SearchFilters):
     query: str = Field(..., description="Search query for papers")
     top_k: int = Field(default=10, ge=1, le=100, description="Number of papers to retrieve")
     project_id: Optional[str] = None
 
-class RankRequest(BaseModel):
+class RankRequest(ResponseShape, SearchFilters):
     project_id: str = Field(..., description="Project ID for context")
     query: str = Field(..., description="Search query for papers")
     top_k: int = Field(default=10, ge=1, le=100, description="Number of papers to retrieve")
     rerank_top_n: int = Field(default=5, ge=1, le=20, description="Number of top results to re-rank")
+    include_context: bool = Field(default=True, description="Echo the project context back in the response")
+
+class ShapedPaperResult(BaseModel):
+    """A search result after ResponseShape is applied: only id is always present"""
+    id: str
+    title: Optional[str] = None
+    abstract: Optional[str] = Field(default=None, description="May be truncated (lean mode or abstract_max_chars)")
+    url: Optional[str] = None
+    authors: Optional[List[str]] = None
+    vector_score: Optional[float] = None
+    relevance_score: Optional[float] = None
+    relevance_explanation: Optional[str] = None
+    is_saved: Optional[bool] = None
 
 class SearchResponse(BaseModel):
-    all_papers: List[PaperResult]
+    all_papers: List[ShapedPaperResult]
+
+class BatchSearchRequest(ResponseShape, SearchFilters):
+    queries: List[str] = Field(..., min_length=1, max_length=50, description="Search queries to run together")
+    top_k: int = Field(default=10, ge=1, le=100, description="Number of papers to retrieve per query")
+    project_id: Optional[str] = None
+    merge: bool = Field(default=False, description="Also return a deduplicated list across all queries")
+
+class QuerySearchResult(BaseModel):
+    query: str
+    papers: List[ShapedPaperResult]
+
+class BatchSearchResponse(BaseModel):
+    results: List[QuerySearchResult]
+    merged_papers: Optional[List[ShapedPaperResult]] = None
 
 class RankResponse(BaseModel):
     query: str
-    project_context: str
-    ranked_papers: List[PaperResult]
+    project_context: Optional[str] = None
+    ranked_papers: List[ShapedPaperResult]
     total_results: int
 
 # RAG Models
-class RAGRequest(BaseModel):
+class RAGRequest(SearchFilters):
     question: str = Field(..., description="Research question to answer")
     project_id: Optional[str] = Field(None, description="Optional project context")
     num_papers: int = Field(default=5, ge=1, le=10, description="Number of papers to use for answer")
+    use_cache: bool = Field(default=True, description="Allow answering from the semantic answer cache")
 
 class RAGResponse(BaseModel):
     question: str
     answer: str
     sources: List[PaperResult]
     project_context: Optional[str] = None
+    cached: bool = Field(default=False, description="True if the answer was served from the semantic cache")
 
 # Summarize Models
 class SummarizeResponse(BaseModel):
@@ -1,57 +1,166 @@
+import os
+import asyncio
+from datetime import datetime, timedelta
 from qdrant import (
     fetch_arxiv_papers_by_category, 
-    populate_qdrant
+    populate_qdrant,
+    existing_paper_ids,
+    qdrant
 )
+from database import SessionLocal, SyncWatermarkDB
+from leader import exclusive
+
+# Major ArXiv categories
+ARXIV_CATEGORIES = [
+    "cs.AI",
+    "cs.LG",
+    "cs.CV",
+    "cs.CL",
+    "cs.NE",
+    "cs.RO",
+    "stat.ML",
+    "math.ST",
+    "physics.comp-ph",
+    "q-bio.QM",
+    "econ.EM",
+    "astro-ph",
+    "cond-mat",
+    "quant-ph",
+    "math.OC",
+    "cs.CR",
+    "cs.DC",
+    "cs.DB",
+]
+
+def sync_categories_from_env():
+    """Categories to sync, overridable with a comma-separated SYNC_CATEGORIES"""
+    value = os.getenv("SYNC_CATEGORIES")
+    if not value:
+        return ARXIV_CATEGORIES
+    return [c.strip() for c in value.split(",") if c.strip()]
+
+def sync_categories(categories=None, initial_papers: int = 100, max_new_papers: int = 1000,
+                    lookback_hours: float = None):
+    """
+    Incrementally sync ArXiv categories using per-category watermarks.
+
+    Categories without a watermark get their latest `initial_papers`. After
+    that, submissions from the watermark onwards are paged oldest first, so the
+    watermark only ever advances over papers that were actually fetched. A
+    `lookback_hours` window before the watermark is re-fetched to catch papers
+    announced late with an older submission date. Papers already in Qdrant are
+    skipped, so only new ones are embedded and upserted.
+
+    Runs hold the "sync" lock, so syncs triggered on different workers run one
+    after another and each reads the watermarks the previous one committed.
+    """
+    categories = categories or sync_categories_from_env()
+    if lookback_hours is None:
+        lookback_hours = float(os.getenv("SYNC_LOOKBACK_HOURS", "48"))
+    with exclusive("sync"):
+        return _sync_categories(categories, initial_papers, max_new_papers, lookback_hours)
+
+def _sync_categories(categories, initial_papers: int, max_new_papers: int, lookback_hours: float):
+    db = SessionLocal()
+    try:
+        reset_watermarks_if_empty(db)
+        watermarks = {w.category: w for w in db.query(SyncWatermarkDB).all()}
+
+        all_papers = []
+        seen_ids = set()
+        newest = {}
+
+        for category in categories:
+            watermark = watermarks.get(category)
+            try:
+                if watermark is None:
+                    papers = fetch_arxiv_papers_by_category(category, max_results=initial_papers)
+                else:
+                    papers = fetch_submitted_range(
+                        category,
+                        watermark.last_submitted - timedelta(hours=lookback_hours),
+                        page_size=max_new_papers
+                    )
+            except Exception as e:
+                print(f"Error fetching {category}: {e}")
+                continue
+
+            if papers:
+                latest = max(papers, key=lambda p: p["published"])
+                newest[category] = (datetime.fromisoformat(latest["published"]), latest["id"])
 
-def populate_by_categories(papers_per_category: int = 100):
-    """Populate with papers from all ArXiv categories"""
-    
-    # Major ArXiv categories
-    categories = [
-        "cs.AI",  
-        "cs.LG", 
-        "cs.CV",  
-        "cs.CL",  
-        "cs.NE",  
-        "cs.RO",  
-        "stat.ML",  
-        "math.ST",  
-        "physics.comp-ph",  
-        "q-bio.QM",  
-        "econ.EM",  
-        "astro-ph",  
-        "cond-mat",  
-        "quant-ph", 
-        "math.OC",  
-        "cs.CR",  
-        "cs.DC",  
-        "cs.DB",  
-    ]
-    
-    all_papers = []
-    seen_ids = set()
-    
-    for category in categories:
-        try:
-            papers = fetch_arxiv_papers_by_category(category, max_results=papers_per_category)
-            
             unique_papers = [p for p in papers if p['id'] not in seen_ids]
-            for p in unique_papers:
-                seen_ids.add(p['id'])
-            
+            seen_ids.update(p['id'] for p in unique_papers)
             all_papers.extend(unique_papers)
-            print(f"  Added {len(unique_papers)} unique papers from {category} (total: {len(all_papers)})")
-            
+
+        # The watermark boundary and lookback window overlap what is already stored
+        existing = existing_paper_ids([p["id"] for p in all_papers])
+        new_papers = [p for p in all_papers if p["id"] not in existing]
+        print(f"  Fetched {len(all_papers)} papers, {len(new_papers)} not yet in Qdrant")
+
+        if new_papers:
+            print(f"\nPopulating Qdrant with {len(new_papers)} new papers...")
+            populate_qdrant(new_papers)
+
+        # Only advance watermarks once the papers are safely in Qdrant
+        for category, (last_submitted, last_paper_id) in newest.items():
+            watermark = watermarks.get(category)
+            if watermark is None:
+                db.add(SyncWatermarkDB(category=category, last_submitted=last_submitted, last_paper_id=last_paper_id))
+            elif last_submitted > watermark.last_submitted:
+                watermark.last_submitted = last_submitted
+                watermark.last_paper_id = last_paper_id
+        db.commit()
+
+        return {
+            "message": f"Synced {len(new_papers)} new papers",
+            "categories_covered": len(categories),
+            "new_papers": len(new_papers)
+        }
+    finally:
+        db.close()
+
+def fetch_submitted_range(category: str, since: datetime, page_size: int):
+    """
+    Page through submissions from `since` onwards (oldest first) until the
+    newest one is reached. Pages overlap at their boundary minute and are
+    deduplicated by ID.
+    """
+    papers = {}
+    cursor = since
+    while True:
+        page = fetch_arxiv_papers_by_category(category, max_results=page_size, submitted_from=cursor)
+        for paper in page:
+            papers[paper["id"]] = paper
+        if len(page) < page_size:
+            break
+        last = datetime.fromisoformat(page[-1]["published"])
+        if last <= cursor:
+            # A whole page within one minute: can't page further by date
+            print(f"  Warning: {category} has more than {page_size} submissions at {cursor}, stopping there")
+            break
+        cursor = last
+    return list(papers.values())
+
+def reset_watermarks_if_empty(db):
+    """
+    Watermarks live in SQLite, separately from Qdrant. If the collection is
+    empty (new, wiped or in-memory), clear them so the next sync re-harvests
+    instead of treating the corpus as up to date.
+    """
+    if qdrant.count(collection_name="all_papers", exact=True).count > 0:
+        return
+    cleared = db.query(SyncWatermarkDB).delete()
+    db.commit()
+    if cleared:
+        print(f"Qdrant collection is empty, cleared {cleared} sync watermarks")
+
+async def sync_periodically(interval_seconds: float, categories=None):
+    """Run sync_categories every interval_seconds in a worker thread"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            result = await asyncio.to_thread(sync_categories, categories)
+            print(f"Scheduled sync: {result['message']}")
         except Exception as e:
-            print(f"Error fetching {category}: {e}")
-            continue
-    
-
-    print(f"\nPopulating Qdrant with {len(all_papers)} papers...")
-    populate_qdrant(all_papers)
-    
-    return {
-        "message": f"Successfully populated {len(all_papers)} unique papers",
-        "categories_covered": len(categories),
-        "total_papers": len(all_papers)
-    }
\ No newline at end of file
+            print(f"Error in scheduled sync: {e}")
@@ -2,22 +2,49 @@ import arxiv
 import hashlib
 import uuid as uuid_lib
 import os
+import time
+from datetime import datetime, timedelta
 from qdrant_client import QdrantClient
 from dotenv import load_dotenv
-from qdrant_client.models import VectorParams, Distance
-from sentence_transformers import SentenceTransformer
+from qdrant_client.models import (
+    VectorParams, Distance, PayloadSchemaType, PointStruct,
+    Filter, FieldCondition, MatchAny, DatetimeRange
+)
+from metrics import timed, record_ingestion
 
 load_dotenv()
 
-# Initialize Qdrant client
-qdrant = QdrantClient(url="http://localhost:6333")
+# Initialize Qdrant client (QDRANT_URL=":memory:" runs an embedded in-memory instance)
+qdrant = QdrantClient(location=os.getenv("QDRANT_URL", "http://localhost:6333"))
 
-# Initialize Sentence Transformer model 
-embedding_model = SentenceTransformer('all-mpnet-base-v2')
+# Sentence Transformer model, loaded on first use so tools that never embed
+# (e.g. snapshot import/export) don't pay for it
+embedding_model = None
+
+def get_embedding_model():
+    """
+    Load the Sentence Transformer model, or use the shared embedding server
+    (embedding_server.py) so multiple workers don't each load their own copy
+    """
+    global embedding_model
+    if embedding_model is None:
+        if os.getenv("EMBEDDING_SERVER"):
+            from embedding_server import RemoteEmbeddingModel
+            embedding_model = RemoteEmbeddingModel(os.getenv("EMBEDDING_SERVER"))
+        else:
+            from sentence_transformers import SentenceTransformer
+            embedding_model = SentenceTransformer('all-mpnet-base-v2')
+    return embedding_model
 
 def get_embedding(text):
     """Generate embeddings locally using Sentence Transformers"""
-    return embedding_model.encode(text).tolist()
+    with timed("embedding"):
+        return get_embedding_model().encode(text).tolist()
+
+def get_embeddings(texts):
+    """Generate embeddings for several texts in one batched encode call"""
+    with timed("embedding"):
+        return get_embedding_model().encode(list(texts)).tolist()
 
 def arxiv_id_to_uuid(arxiv_id: str) -> str:
     """
@@ -50,27 +77,58 @@ def fetch_arxiv_papers(query: str, max_results: int = 10):
         })
     return papers
 
-def fetch_arxiv_papers_by_category(category: str, max_results: int = 100):
-    """Fetch papers from a specific ArXiv category"""
-    search = arxiv.Search(
-        query=f"cat:{category}",
-        max_results=max_results,
-        sort_by=arxiv.SortCriterion.SubmittedDate
-    )
+def _arxiv_date(value: datetime) -> str:
+    return value.strftime("%Y%m%d%H%M")
+
+def fetch_arxiv_papers_by_category(category: str, max_results: int = 100, submitted_from=None):
+    """
+    Fetch papers from a specific ArXiv category.
+
+    Without `submitted_from` this returns the newest submissions first. With
+    it, it returns submissions from `submitted_from` onwards oldest first, so a
+    capped fetch is always a contiguous prefix of the range.
+    """
+    if submitted_from is None:
+        search = arxiv.Search(
+            query=f"cat:{category}",
+            max_results=max_results,
+            sort_by=arxiv.SortCriterion.SubmittedDate,
+            sort_order=arxiv.SortOrder.Descending
+        )
+    else:
+        # ArXiv date ranges have minute resolution and are inclusive
+        submitted_to = datetime.utcnow() + timedelta(days=1)
+        search = arxiv.Search(
+            query=f"cat:{category} AND submittedDate:[{_arxiv_date(submitted_from)} TO {_arxiv_date(submitted_to)}]",
+            max_results=max_results,
+            sort_by=arxiv.SortCriterion.SubmittedDate,
+            sort_order=arxiv.SortOrder.Ascending
+        )
 
     papers = []
-    print(f"Fetching {max_results} papers from category: {category}...")
-    for result in search.results():
-        papers.append({
-            "id": result.get_short_id(),
-            "title": result.title,
-            "abstract": result.summary,
-            "url": result.entry_id,
-            "authors": [a.name for a in result.authors],
-            "category": category
-        })
+    print(f"Fetching up to {max_results} papers from category: {category}...")
+    with timed("arxiv_fetch"):
+        for result in search.results():
+            paper_id = result.get_short_id()
+            published = result.published.replace(tzinfo=None)
+            papers.append({
+                "id": paper_id,
+                "title": result.title,
+                "abstract": result.summary,
+                "url": result.entry_id,
+                "authors": [a.name for a in result.authors],
+                "category": category,
+                "published": published.isoformat()
+            })
     return papers
 
+PAYLOAD_INDEXES = {
+    "id": PayloadSchemaType.KEYWORD,
+    "category": PayloadSchemaType.KEYWORD,
+    "authors": PayloadSchemaType.KEYWORD,
+    "published": PayloadSchemaType.DATETIME,
+}
+
 def ensure_collection():
     """Ensure the Qdrant collection exists"""
     collections = qdrant.get_collections().collections
@@ -88,6 +146,43 @@ def ensure_collection():
     else:
         print("Qdrant collection already exists")
 
+    # Payload indexes let filtered searches run inside HNSW instead of scanning
+    existing = qdrant.get_collection("all_papers").payload_schema or {}
+    for field, schema in PAYLOAD_INDEXES.items():
+        if field not in existing:
+            qdrant.create_payload_index(
+                collection_name="all_papers",
+                field_name=field,
+                field_schema=schema
+            )
+            print(f"Created payload index on {field}")
+
+def build_search_filter(filters):
+    """Build a Qdrant filter from a request's SearchFilters fields, or None if none are set"""
+    conditions = []
+    if filters.categories:
+        conditions.append(FieldCondition(key="category", match=MatchAny(any=filters.categories)))
+    if filters.authors:
+        conditions.append(FieldCondition(key="authors", match=MatchAny(any=filters.authors)))
+    if filters.published_after or filters.published_before:
+        conditions.append(FieldCondition(
+            key="published",
+            range=DatetimeRange(gte=filters.published_after, lte=filters.published_before)
+        ))
+    return Filter(must=conditions) if conditions else None
+
+def existing_paper_ids(paper_ids):
+    """Return the subset of ArXiv IDs that are already in the collection"""
+    if not paper_ids:
+        return set()
+    with timed("qdrant_retrieve"):
+        points = qdrant.retrieve(
+            collection_name="all_papers",
+            ids=[arxiv_id_to_uuid(paper_id) for paper_id in paper_ids],
+            with_payload=["id"]
+        )
+    return {point.payload["id"] for point in points}
+
 def populate_qdrant(papers):
     """
     Populate Qdrant with papers (automatically handles duplicates).
@@ -97,6 +192,7 @@ def populate_qdrant(papers):
     - Different ArXiv ID → Different UUID → New paper
 
     """
+    start = time.perf_counter()
     points = []
     print(f"Generating embeddings for {len(papers)} papers...")
     for i, paper in enumerate(papers):
@@ -108,20 +204,22 @@ def populate_qdrant(papers):
         # Convert ArXiv ID to valid UUID
         point_id = arxiv_id_to_uuid(paper["id"])
         
-        points.append({
-            "id": point_id,  
-            "vector": vector,
-            "payload": paper  
-        })
+        points.append(PointStruct(
+            id=point_id,
+            vector=vector,
+            payload=paper
+        ))
     
     print("Uploading to Qdrant...")
     # Upload in batches of 100
     batch_size = 100
     for i in range(0, len(points), batch_size):
         batch = points[i:i + batch_size]
-        qdrant.upsert(collection_name="all_papers", points=batch)
+        with timed("qdrant_upsert"):
+            qdrant.upsert(collection_name="all_papers", points=batch)
         print(f"  Uploaded batch {i//batch_size + 1}/{(len(points)-1)//batch_size + 1}")
     
+    record_ingestion(len(points), time.perf_counter() - start)
     print(f"Successfully processed {len(points)} papers (overwrote any duplicates)")
     return points
 
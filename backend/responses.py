@@ -0,0 +1,13 @@
+import orjson
+from starlette.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson. Returning it directly from an endpoint
+    also skips FastAPI's response_model re-validation, which dominates CPU for
+    large search responses.
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
@@ -0,0 +1,162 @@
+"""
+Export and restore the embedded paper corpus without re-embedding.
+
+A snapshot is a directory containing:
+    manifest.json    collection name, vector size, distance and point count
+    vectors.npy      float32 (count x dim) matrix, memory-mapped on import
+    ids.txt          one Qdrant point ID per line, aligned with vectors.npy
+    payloads.jsonl   one paper payload per line, aligned with vectors.npy
+
+Usage (from backend/):
+    uv run python snapshot.py export snapshots/corpus
+    uv run python snapshot.py import snapshots/corpus
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+import numpy as np
+from qdrant import qdrant, ensure_collection
+from metrics import record_ingestion
+
+COLLECTION = "all_papers"
+
+
+def export_collection(path: str, batch_size: int = 1000):
+    """Write every point's ID, payload and vector in the collection to a snapshot directory"""
+    os.makedirs(path, exist_ok=True)
+    info = qdrant.get_collection(COLLECTION)
+    vector_params = info.config.params.vectors
+    count = qdrant.count(collection_name=COLLECTION, exact=True).count
+
+    print(f"Exporting {count} papers from {COLLECTION} to {path}...")
+    start = time.perf_counter()
+    vectors = np.lib.format.open_memmap(
+        os.path.join(path, "vectors.npy"), mode="w+", dtype=np.float32, shape=(count, vector_params.size)
+    )
+
+    written = 0
+    offset = None
+    with open(os.path.join(path, "ids.txt"), "w") as ids_file, \
+            open(os.path.join(path, "payloads.jsonl"), "w") as payload_file:
+        while written < count:
+            points, offset = qdrant.scroll(
+                collection_name=COLLECTION,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True
+            )
+            for point in points[:count - written]:
+                vectors[written] = point.vector
+                ids_file.write(f"{point.id}\n")
+                payload_file.write(json.dumps(point.payload) + "\n")
+                written += 1
+            print(f"  Exported {written}/{count} papers...")
+            if offset is None:
+                break
+
+    vectors.flush()
+    del vectors
+    if written < count:
+        # Points were deleted during the export: shrink the matrix to what was written
+        _truncate_vectors(os.path.join(path, "vectors.npy"), written, batch_size)
+
+    with open(os.path.join(path, "manifest.json"), "w") as f:
+        json.dump({
+            "collection": COLLECTION,
+            "count": written,
+            "dim": vector_params.size,
+            "distance": str(vector_params.distance.value),
+            "created_at": datetime.utcnow().isoformat()
+        }, f, indent=2)
+
+    print(f"Exported {written} papers in {time.perf_counter() - start:.1f}s")
+    return written
+
+
+def _truncate_vectors(path: str, rows: int, batch_size: int):
+    """Rewrite a .npy matrix with only its first `rows` rows, copying through memmaps"""
+    source = np.load(path, mmap_mode="r")
+    tmp_path = path + ".tmp"
+    target = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=source.dtype, shape=(rows, source.shape[1]))
+    for start in range(0, rows, batch_size):
+        end = min(start + batch_size, rows)
+        target[start:end] = source[start:end]
+    target.flush()
+    del source, target
+    # np.save would append .npy to the temp name, so move the file explicitly
+    os.replace(tmp_path, path)
+
+
+def _read_lines(path: str, parse=None):
+    with open(path) as f:
+        for line in f:
+            line = line.rstrip("\n")
+            yield parse(line) if parse else line
+
+
+def _count_lines(path: str) -> int:
+    with open(path, "rb") as f:
+        return sum(1 for _ in f)
+
+
+def import_collection(path: str, batch_size: int = 1000, parallel: int = 1):
+    """Bulk-load a snapshot directory into the collection (overwrites points with the same IDs)"""
+    with open(os.path.join(path, "manifest.json")) as f:
+        manifest = json.load(f)
+
+    ensure_collection()
+    vector_params = qdrant.get_collection(COLLECTION).config.params.vectors
+    if manifest["dim"] != vector_params.size:
+        raise ValueError(f"Snapshot has {manifest['dim']}-d vectors, collection expects {vector_params.size}")
+
+    vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+    # upload_collection zips these lazily, so a short or extra line would silently drop or misalign points
+    counts = {
+        "vectors.npy": vectors.shape[0],
+        "ids.txt": _count_lines(os.path.join(path, "ids.txt")),
+        "payloads.jsonl": _count_lines(os.path.join(path, "payloads.jsonl"))
+    }
+    mismatched = {name: n for name, n in counts.items() if n != manifest["count"]}
+    if mismatched:
+        raise ValueError(f"Snapshot is inconsistent: manifest count is {manifest['count']}, but {mismatched}")
+    if vectors.shape[1] != manifest["dim"]:
+        raise ValueError(f"vectors.npy has {vectors.shape[1]}-d vectors, manifest says {manifest['dim']}")
+
+    print(f"Importing {manifest['count']} papers from {path}...")
+    start = time.perf_counter()
+
+    qdrant.upload_collection(
+        collection_name=COLLECTION,
+        vectors=vectors,
+        ids=_read_lines(os.path.join(path, "ids.txt")),
+        payload=_read_lines(os.path.join(path, "payloads.jsonl"), json.loads),
+        batch_size=batch_size,
+        parallel=parallel,
+        wait=True
+    )
+
+    elapsed = time.perf_counter() - start
+    record_ingestion(manifest["count"], elapsed)
+    print(f"Imported {manifest['count']} papers in {elapsed:.1f}s")
+    return manifest["count"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or import the embedded paper corpus")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("path", help="Snapshot directory")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--parallel", type=int, default=1, help="Parallel upload workers for import")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_collection(args.path, batch_size=args.batch_size)
+    else:
+        import_collection(args.path, batch_size=args.batch_size, parallel=args.parallel)
+
+
+if __name__ == "__main__":
+    main()